@@ -3,13 +3,31 @@
 # Licensed under the MIT License
 # See LICENSE file or https://opensource.org/licenses/MIT for details
 
-import argparse, json, os, subprocess, sys, shutil, stat, hashlib, glob 
+import argparse, json, os, subprocess, sys, shutil, stat, hashlib, glob, mmap, fnmatch, re, collections, tempfile, random
 import logging
 import time
+import functools
 
 import threading
+import concurrent.futures
+from pathlib import Path
+try:
+    import blake3 # optional, MUCH faster than sha256 for hashing sources. pip install blake3
+except ImportError:
+    blake3 = None
+try:
+    import xxhash # optional, used when blake3 isn't installed. not cryptographic, but a cache key doesn't need to be. pip install xxhash
+except ImportError:
+    xxhash = None
+try:
+    import orjson # optional, loads/saves the cache a lot faster than json. pip install orjson
+except ImportError:
+    orjson = None
+try:
+    from fastcdc import fastcdc # optional, keeps a deduplicated chunk store of object files. pip install fastcdc
+except ImportError:
+    fastcdc = None
 handler = logging.StreamHandler()
-COMPILER_LOGS = ""
 if sys.version_info < (3,10):
     logger.fatal("ForgeBuild requires Python 3.10 or higher! please update your Python installation.")
     sys.exit(1)
@@ -39,7 +57,6 @@ def success(self, message, *args, **kwargs):
     if self.isEnabledFor(SUCCESS_LEVEL):
         self._log(SUCCESS_LEVEL, message, args, **kwargs)
 def GlitchText(text):
-    import random
     # Unicode combining diacritical marks (the real glitch stuff)
     glitch_chars = [chr(i) for i in range(0x0300, 0x036F)]
 
@@ -60,85 +77,455 @@ logger.addHandler(handler)
 logger = logging.getLogger("ForgeBuild")
 
 CACHE_PATH = ".forgebuild/cache.json"
+UMASK = os.umask(0o022) # the only way to read the umask is to set it, so put it straight back.
+os.umask(UMASK)         # done once at import, before any thread exists
+CACHE_DIR = ".forgebuild/cache"
+CHUNK_DIR = ".forgebuild/cache/chunks"
+RACY_WINDOW_NS = 2_000_000_000 # FAT only keeps mtimes in 2 second steps, most filesystems are much finer
+MAX_BATCH = 8 # sources per compiler call, keeps the command line short (windows caps it at 32k chars) and the jobs balanced
+LOG_TAIL = 65536 # bytes of compiler output we keep per compile, -v logs and template errors can get huge
+# a path in a depfile, "\ " is an escaped space. a backslash-newline is never part of a token, so it acts as whitespace
+DEP_TOKEN = re.compile(r"(?:\\.|[^\s\\])+")
+DEP_RULE_END = re.compile(r"(?<!\\)\n")
 def parse_dependencies(depfile): 
     try:
         with open(depfile, "r") as f:
             content = f.read()
-        # depfile format: target: dep1 dep2 dep3 ...
-        parts = content.replace("\\\n", " ").split(":")
-        if len(parts) > 1:
-            deps = parts[1].split()
-            return deps
+        # depfile format: target: dep1 dep2 \
+        #                   dep3 ...
+        # the target ends at the first colon followed by whitespace, so C:\ paths don't trip it up
+        start = re.search(r":(?=\s)", content)
+        if start:
+            end = DEP_RULE_END.search(content, start.end()) # first rule only
+            endpos = end.start() if end else len(content)
+            return [dep.replace("\\ ", " ") for dep in DEP_TOKEN.findall(content, start.end(), endpos)]
     except Exception as e:
         logger.error(f"Failed to parse {depfile}: {e}")
     return []
-def hash_file(path):
-    import hashlib
-    h = hashlib.sha256()
+MMAP_MIN_SIZE = 65536 # below this, setting up a mapping costs more than copying the bytes (and empty files can't be mapped)
+sha256 = hashlib.sha256 # looked up once, hash_file runs for every source and header
+hash_buffers = threading.local()
+def map_file(f):
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"): # not on windows
+        mm.madvise(mmap.MADV_SEQUENTIAL) # read front to back once, so ask for aggressive readahead
+    return mm
+
+def hash_file(path, size=None):
+    # size is passed in when the caller already stat'ed the file, no point asking the OS twice
     try:
         with open(path, "rb") as f:
-            size = os.path.getsize(path)
-            while chunk := f.read(8192):
-                h.update(chunk)
+            if size is None:
+                size = os.fstat(f.fileno()).st_size
+            if blake3 is not None:
+                if size >= MMAP_MIN_SIZE:
+                    # blake3 hashes the mapped file with SIMD across threads
+                    h = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                    with map_file(f) as mm:
+                        h.update(mm)
+                else:
+                    # most sources are small, spinning up threads and a mapping costs more than the hash
+                    h = blake3.blake3(f.read())
+                return "b3:" + h.hexdigest() # tagged so old sha256 cache entries never match
+            if xxhash is not None:
+                h = xxhash.xxh3_128()
+                if size >= MMAP_MIN_SIZE:
+                    with map_file(f) as mm:
+                        h.update(mm)
+                else:
+                    h.update(f.read())
+                return "xx3:" + h.hexdigest() # same idea, switching hashers just means one rebuild
+            if size >= MMAP_MIN_SIZE:
+                # big files: let openssl read straight out of the page cache, no copies into python
+                with map_file(f) as mm:
+                    return sha256(mm).hexdigest()
+            if hasattr(hashlib, "file_digest"): # python 3.11+
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            # python 3.10: read into one reusable buffer per thread, no new bytes object per chunk
+            buf = getattr(hash_buffers, "buf", None)
+            if buf is None:
+                buf = hash_buffers.buf = bytearray(MMAP_MIN_SIZE) # anything bigger took the mmap path above
+            h = sha256()
+            with memoryview(buf) as view:
+                while n := f.readinto(buf):
+                    h.update(view[:n])
         return h.hexdigest()
     except Exception as e:
         logger.error(f"Failed to hash {path}: {e}")
         return f"ERROR: {e}"
-from pathlib import Path
 
-def expand_sources(source_list):
-    expanded = set()
-    logger.info("globbing sources... please wait.")
-    
-    for entry in source_list:
-        if "*" in entry:
-            base = entry.split("**")[0].rstrip("/")
-            pattern = entry.split("/")[-1]
-            matched = Path(base).rglob(pattern)
-            for path in matched:
-                norm = os.path.normpath(str(path))
-                # Skip hidden folders or dot-prefixed paths, we ignore dot-prefixed paths to avoid looking in forgebuild's cache folder. since it is independent per project!
-                if any(part.startswith('.') for part in Path(norm).parts):
+# headers are shared between lots of TUs, so remember what we already hashed this run.
+# keyed on (mtime, size) so an edited file still gets rehashed.
+@functools.lru_cache(maxsize=None)
+def _hash_cached(path, mtime_ns, size):
+    return hash_file(path, size)
+
+def file_stamp(path):
+    # (mtime, size) is enough to tell if a file *might* have changed. lists, since that is what json gives back
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def hash_if_changed(path, stamp, cached_hash, cached_stamp):
+    # same stamp as last build? then the file wasn't touched and the old hash still holds
+    if cached_hash and stamp is not None and stamp == cached_stamp:
+        return cached_hash
+    if stamp is None:
+        return hash_file(path)
+    return _hash_cached(path, *stamp)
+
+# shared by every header hash (and object chunking), so the threads are reused across sources instead of started per TU
+hash_pool = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="forgebuild-hash")
+
+def _listdir(base, listings=None):
+    # returns (folders, files) in base, skipping dot-prefixed names.
+    # we ignore dot-prefixed paths to avoid looking in forgebuild's cache folder. since it is independent per project!
+    # listings remembers folder contents between builds, a folder whose mtime didn't move can't have gained or lost entries
+    try:
+        mtime = os.stat(base).st_mtime_ns
+    except OSError:
+        return [], []
+    if listings is not None:
+        cached = listings["old"].get(base)
+        if cached and cached["mtime_ns"] == mtime:
+            listings["new"][base] = cached
+            return cached["dirs"], cached["files"]
+    dirs, files = [], []
+    scanned = listings["entries"] if listings is not None else None
+    try:
+        with os.scandir(base) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
                     continue
-                expanded.add(norm)
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+                    if scanned is not None:
+                        scanned[_child(base, entry.name)] = entry # so expand_sources can stat from it later
+    except OSError:
+        return [], []
+    # a folder changed within RACY_WINDOW_NS of this scan can gain an entry without its mtime moving (coarse timestamps),
+    # so that listing isn't kept and the folder gets scanned again next build
+    if listings is not None and mtime < listings["trust_before"]:
+        listings["new"][base] = {"mtime_ns": mtime, "dirs": dirs, "files": files}
+    return dirs, files
+
+def _child(folder, name):
+    # folder is already normalized and name has no separators, so plain concatenation gives a normalized path
+    if folder == ".":
+        return name
+    if folder.endswith(os.sep):
+        return folder + name
+    return folder + os.sep + name
+
+def _walk(base, match, out, listings=None):
+    # hand rolled instead of rglob so we never even *enter* dot-prefixed folders.
+    # explicit stack instead of recursion, so a deep tree can't hit the recursion limit
+    stack = [base]
+    while stack:
+        folder = stack.pop()
+        dirs, files = _listdir(folder, listings)
+        for name in files:
+            if match(name):
+                out.append(_child(folder, name))
+        stack.extend(_child(folder, name) for name in dirs)
+
+def _has_magic(part):
+    return any(c in part for c in "*?[")
+
+def _split_glob(entry):
+    # "src/**/*.cpp" -> ("src", ["**"], "*.cpp"). the literal prefix never needs scanning, we just start there
+    parts = entry.split("/")
+    for i, part in enumerate(parts):
+        if _has_magic(part):
+            return "/".join(parts[:i]) or ".", parts[i:-1], parts[-1]
+    return entry, [], None
+
+def _compile_tails(tails):
+    # one matcher for every file name pattern that shares a folder walk, built once instead of per file
+    nocase = os.path.normcase("A") == "a" # windows globs are case insensitive
+    if all(t.startswith("*") and not _has_magic(t[1:]) for t in tails):
+        # "*.cpp" style tails are just a suffix check, no regex needed
+        if nocase:
+            suffixes = tuple(t[1:].lower() for t in tails)
+            return lambda name: name.lower().endswith(suffixes)
+        suffixes = tuple(t[1:] for t in tails)
+        return lambda name: name.endswith(suffixes)
+    return re.compile("|".join(fnmatch.translate(t) for t in tails), re.IGNORECASE if nocase else 0).match
+
+def _glob(base, parts, match, out, listings=None):
+    # parts are the folder segments still to match, match() tests the file name
+    if not parts:
+        for name in _listdir(base, listings)[1]:
+            if match(name):
+                out.append(_child(base, name))
+        return
+    head, rest = parts[0], parts[1:]
+    if head == "**":
+        if not rest:
+            _walk(base, match, out, listings) # the common "dir/**/*.cpp" case, one listing per folder
+            return
+        _glob(base, rest, match, out, listings) # ** can match zero folders
+    for name in _listdir(base, listings)[0]:
+        if head == "**":
+            _glob(_child(base, name), parts, match, out, listings)
+        elif fnmatch.fnmatch(name, head):
+            _glob(_child(base, name), rest, match, out, listings)
+
+def expand_sources(source_list, dir_cache=None, verbose=False, stamps=None):
+    expanded = {} # dict as an ordered set, so the same tree always gives the same source (and link) order
+    logger.info("globbing sources... please wait.")
+    # only folders we actually visit this time are kept, so deleted folders drop out of the cache.
+    # entries holds the DirEntry of every file scanned this time (not saved, they're only good for this process)
+    listings = {
+        "old": dir_cache or {},
+        "new": {},
+        "entries": {},
+        "trust_before": time.time_ns() - RACY_WINDOW_NS, # taken before any folder is scanned
+    } if dir_cache is not None else None
+
+    # patterns that only differ in the file name ("src/**/*.cpp" and "src/**/*.c") share one walk
+    groups = {}
+    for entry in dict.fromkeys(source_list):
+        if _has_magic(entry):
+            base, parts, tail = _split_glob(entry)
+            base = os.path.normpath(base) # once per pattern, the walk builds normalized paths from here
+            # Skip hidden folders or dot-prefixed paths
+            if any(part.startswith('.') for part in Path(base).parts):
+                continue
+            groups.setdefault((base, tuple(parts)), []).append(tail)
         else:
             norm = os.path.normpath(entry)
             if any(part.startswith('.') for part in Path(norm).parts):
                 continue
-            expanded.add(norm)
+            expanded[norm] = None
+
+    for (base, parts), tails in groups.items():
+        # a missing base just lists as empty, no separate isdir() needed.
+        # shallow patterns like "src/*.cpp" have no folder parts left, so they cost exactly one listing
+        matched = []
+        _glob(base, list(parts), _compile_tails(tails), matched, listings)
+        expanded.update(dict.fromkeys(sorted(matched))) # scandir order depends on the filesystem, sorted doesn't
+
+    if listings is not None:
+        dir_cache.clear()
+        dir_cache.update(listings["new"])
 
     # Final deduplication pass
     final_sources = list(expanded)
-    for i in final_sources:
-        logger.info(f"file search: {i}")
+
+    # on windows DirEntry.stat() comes free with the folder listing, so build_project doesn't have to stat each source again.
+    # folders served from dir_cache weren't scanned, those sources just get stat'ed the normal way
+    if stamps is not None and listings is not None:
+        scanned = listings["entries"]
+        for src in final_sources:
+            entry = scanned.get(src)
+            if entry is None:
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stamps[src] = [st.st_mtime_ns, st.st_size]
+    if verbose: # one line per file adds up fast on big trees
+        for i in final_sources:
+            logger.info(f"file search: {i}")
+    logger.info(f"globbed {len(final_sources)} sources")
     return final_sources
 
+# --build --run (or --sync --build) used to parse forgebuild.json over and over, now it is once per process.
+# keyed on mtime so an edited file still gets picked up
+@functools.lru_cache(maxsize=1)
+def _load_config_cached(mtime_ns):
+    logger.info("loading project configuration data...")
+    with open("forgebuild.json", "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 def load_config(verbose=False):
     try:
-        logger.info("loading project configuration data...")
-        with open("forgebuild.json", "r") as f:
-            data = json.load(f)
-            if verbose:
-                logger.info(f"project data: {data}")
-            return data
+        data = _load_config_cached(os.stat("forgebuild.json").st_mtime_ns)
+        if verbose:
+            logger.info(f"project data: {data}")
+        return data
         
     except Exception as e:
         logger.fatal(f"Error loading project configuration data: {e}")
         sys.exit(1)
 
+@functools.lru_cache(maxsize=None)
+def ensure_dir(path):
+    # makedirs stats every level each call, once a folder exists this process we stop asking
+    os.makedirs(path, exist_ok=True)
+
+def read_log_tail(f):
+    # the log sits in a temp file, only pull its end into memory
+    size = f.seek(0, os.SEEK_END)
+    f.seek(max(0, size - LOG_TAIL))
+    text = f.read().decode(errors="replace")
+    return "[...]" + text if size > LOG_TAIL else text
+
+def read_json(path):
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return {}
+        if size < MMAP_MIN_SIZE or orjson is None:
+            # sidecars are a few hundred bytes, a plain read beats setting up a mapping. json wants real bytes anyway
+            data = f.read()
+            return orjson.loads(data) if orjson is not None else json.loads(data)
+        # big cache.json: parse straight out of the page cache instead of reading it into a bytes object first
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def dump_json(data):
+    # no indentation, nobody reads these by hand and they add up on large projects
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+def write_atomic(path, raw):
+    # write next to it and rename over, a ctrl-c halfway through leaves the old file instead of half a json.
+    # mkstemp gives every writer its own temp name, so two builds in the same project can't write into the same .tmp
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        if hasattr(os, "fchmod"): # not on windows (before 3.13), where the mode doesn't mean much anyway
+            os.fchmod(fd, 0o666 & ~UMASK) # mkstemp makes 0600 files, a shared cache folder needs the usual mode
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def write_json(path, data):
+    write_atomic(path, dump_json(data))
+
+def cache_name(src):
+    # the cache folder is flat, so foo/util.cpp and bar/util.cpp need more than their file name to stay apart.
+    # a short hash of the path does that, the stem is only there so humans can tell what is what
+    stem = os.path.splitext(os.path.basename(src))[0]
+    tag = hashlib.blake2b(os.path.normcase(src).encode(), digest_size=8).hexdigest()
+    return os.path.join(CACHE_DIR, f"{tag}_{stem}")
+
 def load_cache():
-    if not os.path.exists(CACHE_PATH):
-        return {}
+    cache = {}
+    if os.path.exists(CACHE_PATH):
+        try:
+            cache = read_json(CACHE_PATH)
+        except Exception:
+            cache = {}
+    # every source has its own .meta.json next to its object file (see save_entry)
+    try:
+        entries = os.scandir(CACHE_DIR)
+    except OSError:
+        return cache
+    with entries:
+        for entry in entries:
+            if not entry.name.endswith(".meta.json"):
+                continue
+            try:
+                meta = read_json(entry.path)
+                src = meta.pop("src")
+            except Exception:
+                continue # a broken sidecar just means that file gets rebuilt
+            if entry.name != os.path.basename(cache_name(src)) + ".meta.json":
+                continue # left over from before object names had a path hash in them
+            cache[src] = meta
+    return cache
+
+def save_entry(meta_path, src, entry):
+    # written by whichever thread compiled src, so there is no shared file to fight over
+    write_json(meta_path, {"src": src, **entry})
+
+def store_chunks(obj):
+    # split the object at content-defined cut points so objects that barely changed share most chunks.
+    # if .forgebuild/cache is shared (CI!) a lost object can be put back together instead of recompiled
+    index = obj + ".chunks.json"
+    if fastcdc is None:
+        if os.path.exists(index):
+            os.remove(index) # it describes an older build of this object now
+        return
+    ensure_dir(CHUNK_DIR)
+    chunks = []
+    for chunk in fastcdc(obj, avg_size=16384, fat=True):
+        digest = hashlib.sha256(chunk.data).hexdigest()
+        path = os.path.join(CHUNK_DIR, digest + ".bin")
+        if not os.path.exists(path):
+            write_atomic(path, chunk.data)
+        chunks.append(digest)
+    write_json(index, {"chunks": chunks})
+
+def restore_chunks(obj):
     try:
-        with open(CACHE_PATH, "r") as f:
-            return json.load(f)
+        chunks = read_json(obj + ".chunks.json")["chunks"]
     except Exception:
-        return {}
+        return False
+    parts = []
+    for digest in chunks:
+        try:
+            with open(os.path.join(CHUNK_DIR, digest + ".bin"), "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        if hashlib.sha256(data).hexdigest() != digest:
+            # damaged chunk (shared caches see a lot of hands), compiling is the safe way out.
+            # drop it too, store_chunks skips digests that already exist and would never write it again
+            try:
+                os.remove(os.path.join(CHUNK_DIR, digest + ".bin"))
+            except OSError:
+                pass
+            return False
+        parts.append(data)
+    write_atomic(obj, b"".join(parts))
+    return True
+
+def prune_chunks():
+    # a chunk only stays while some object's .chunks.json still points at it, otherwise the store grows forever
+    live = set()
+    try:
+        entries = os.scandir(CACHE_DIR)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.name.endswith(".chunks.json"):
+                try:
+                    live.update(read_json(entry.path)["chunks"])
+                except Exception:
+                    continue
+    try:
+        entries = os.scandir(CHUNK_DIR)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            digest, ext = os.path.splitext(entry.name)
+            # .tmp is what an interrupted write_atomic leaves behind, nothing ever points at those
+            if ext == ".tmp" or (ext == ".bin" and digest not in live):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
 
 def save_cache(cache):
-    os.makedirs(".forgebuild", exist_ok=True)
-    with open(CACHE_PATH, "w") as f:
-        json.dump(cache, f, indent=4)
+    ensure_dir(".forgebuild")
+    # per-source entries are already on disk as sidecars, only the shared bits live in cache.json
+    raw = dump_json({"dir_cache": cache.get("dir_cache", {}), "link": cache.get("link")})
+    # no-op builds usually end up with exactly what is already there, reading it back is cheaper than a write + rename
+    try:
+        with open(CACHE_PATH, "rb") as f:
+            if f.read() == raw:
+                return
+    except OSError:
+        pass
+    write_atomic(CACHE_PATH, raw)
 
 
 def run_diagnostics():
@@ -153,7 +540,6 @@ def run_diagnostics():
         logger.info(f"Found Clang at {clang_path}")
     else:
         logger.warning("Clang not found in PATH")
-    if not clang_path:
         logger.error("No supported C++ compiler found (Clang)") # We dont support G++ anymore, since that is dropped in 5.0
 
     # 2. Check for forgebuild.json
@@ -170,7 +556,7 @@ def run_diagnostics():
 
     logger.success("Diagnostics complete.")
 
-def sync_dependencies(force=False):
+def sync_dependencies(force=False, full_history=False):
     start_sync = time.perf_counter()
 
     config = load_config()
@@ -183,6 +569,7 @@ def sync_dependencies(force=False):
     include_dir = "include"
     os.makedirs(include_dir, exist_ok=True)
 
+    clones = {} # path -> (name, repo)
     for dep in deps:
         if not isinstance(dep, dict):
             logger.fatal(f"Malformed dependency entry: {dep}")
@@ -197,6 +584,9 @@ def sync_dependencies(force=False):
 
         path = os.path.join(include_dir, name)
 
+        if path in clones:
+            logger.warning(f"Skipping {name} — listed more than once")
+            continue
         if os.path.exists(path):
             if force:
                 logger.info(f"Force re-syncing {name} from {repo}")
@@ -204,18 +594,38 @@ def sync_dependencies(force=False):
             else:
                 logger.info(f"Skipping {name} — already cloned")
                 continue
-        logger.info(f"Cloning {name} from {repo} into {path}")
+        clones[path] = (name, repo)
+
+    # dependencies are just headers/sources to build against, their history is dead weight unless asked for
+    git_flags = [] if full_history else ["--", "--depth=1", "--single-branch"]
+
+    def clone(path, repo):
         clone_start = time.perf_counter()
-        result = subprocess.run(["gh", "repo", "clone", repo, path], capture_output=True, text=True)
-        clone_end = time.perf_counter()
+        result = subprocess.run(["gh", "repo", "clone", repo, path] + git_flags, capture_output=True, text=True)
+        return result, time.perf_counter() - clone_start
+
+    # every clone is its own network bound gh process, so they can all wait on the network at the same time.
+    # results are logged here in the main thread so the output of different clones doesn't interleave
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {}
+        for path, (name, repo) in clones.items():
+            logger.info(f"Cloning {name} from {repo} into {path}")
+            futures[executor.submit(clone, path, repo)] = path
+        for future in concurrent.futures.as_completed(futures):
+            name, repo = clones[futures[future]]
+            try:
+                result, clone_time = future.result()
+            except Exception as e:
+                logger.error(f"Failed to clone {repo} — {e}")
+                continue
 
-        logger.info("stdout:\n" + (result.stdout or " [empty]"))
-        logger.info("stderr:\n" + (result.stderr or " [empty]"))
+            logger.info("stdout:\n" + (result.stdout or " [empty]"))
+            logger.info("stderr:\n" + (result.stderr or " [empty]"))
 
-        if result.returncode != 0:
-            logger.error(f"Failed to clone {repo} — exit code {result.returncode}")
-        else:
-            logger.success(f"Cloned {name} in {clone_end - clone_start:.2f} seconds")
+            if result.returncode != 0:
+                logger.error(f"Failed to clone {repo} — exit code {result.returncode}")
+            else:
+                logger.success(f"Cloned {name} in {clone_time:.2f} seconds")
 
     end_sync = time.perf_counter()
     logger.info(f"Total dependency sync time: {end_sync - start_sync:.2f} seconds")
@@ -243,6 +653,7 @@ int main() {
         "targets": {
             "app": {
                 "nocache" : "no",
+                "ccache" : "yes", # only does anything if ccache is on PATH
                 "sources": [
                 "src/**/*.cpp",
                 "src/**/*.c",
@@ -287,15 +698,6 @@ py "{script_path}" @args
 
     logging.info("ForgeBuild project initialized")
 
-
-
-import os
-import subprocess
-import threading
-import concurrent.futures
-
-cache_lock = threading.Lock()
-object_lock = threading.Lock()
 def run_project(verbose=False):
     config = load_config(verbose=verbose)
     target = list(config["targets"].keys())[0]
@@ -325,10 +727,11 @@ def run_project(verbose=False):
             break
 
 
-def build_project(verbose=False, use_cache=False, fast=False, jobs=None,comp=None, argu=None):
+def build_project(verbose=False, use_cache=False, fast=False, jobs=None,comp=None, argu=None, content_hash=False):
     if not argu.sync and not argu.force_sync:
         logger.warning("it is recommended to run --sync before building to ensure all dependencies are up to date! (ignore this if you dont have dependencies or have already synced!)")
     build_timer = time.perf_counter()
+    stamp_time = time.time_ns() # before anything gets stat'ed or hashed
     compiled_count = 0
     config = load_config(verbose=verbose)
 
@@ -338,7 +741,7 @@ def build_project(verbose=False, use_cache=False, fast=False, jobs=None,comp=Non
     nocache = tconf.get("nocache", "no") # default to "no" if not specified
     if nocache not in ("yes", "no"):
         logger.error("Invalid value for 'nocache'. Must be 'yes' or 'no'.")
-        return
+        return False
 
     if nocache == "yes":
         logger.info("ignoring cache because nocache is in the project data file!")
@@ -347,6 +750,8 @@ def build_project(verbose=False, use_cache=False, fast=False, jobs=None,comp=Non
         logger.warning("DISABLING CACHING CAN MAKE BUILDS SLOW! ! !")
 
     cache = load_cache() if use_cache else {}
+    if content_hash and use_cache:
+        logger.info("--content-hash: not trusting timestamps, every source and header gets hashed.")
 
     compiler = tconf["compiler"]
     if comp != None:
@@ -354,11 +759,26 @@ def build_project(verbose=False, use_cache=False, fast=False, jobs=None,comp=Non
 
     elif compiler == "clang":
         logger.critical("if you were intending to use clang (thinking it was an alias for clang++) it is NOT. please rebuild with clang++!")
-        return
+        return False
     if compiler not in ("clang++"):
         logger.critical("unsupported compiler specified! only clang++ is supported (G++ was removed at 10/12/2025 for the upcoming 5.0 release!)")
-        return
+        return False
     logger.info(f"using compiler: {compiler}")
+    # look it up on PATH once, otherwise every compile and the link repeat the search (on windows that's once per PATHEXT entry too)
+    compiler = shutil.which(compiler) or compiler
+
+    # ccache keys on the preprocessed source, so it still hits where our cache can't (branch switches, fresh clones, CI).
+    # only used for compiles, it can't cache a link. "ccache": "no" in the target turns it off
+    use_ccache = tconf.get("ccache", "yes") # default to "yes" if not specified
+    if use_ccache not in ("yes", "no"):
+        logger.error("Invalid value for 'ccache'. Must be 'yes' or 'no'.")
+        return False
+    launcher = []
+    if use_ccache == "yes":
+        ccache = shutil.which("ccache")
+        if ccache:
+            logger.info(f"using ccache: {ccache}")
+            launcher = [ccache]
 
     flags = tconf["flags"][:]
     if verbose and "-v" not in flags:
@@ -368,120 +788,318 @@ def build_project(verbose=False, use_cache=False, fast=False, jobs=None,comp=Non
         flags.append("-Ofast")
 
     raw_sources = tconf["sources"]
-    sources = expand_sources(raw_sources)
+    walk_stamps = {}
+    sources = expand_sources(raw_sources, cache.setdefault("dir_cache", {}), verbose=verbose, stamps=walk_stamps)
 
     for sr in sources:
         if os.path.isfile(sr):
             ext = os.path.splitext(sr)[1].lower()
             if ext in [".h", ".hpp"]:
                 logger.critical("source files CANNOT be .hpp or .h files!")
-                return
+                return False
 
     output = tconf["output"]
     exe_path = tconf.get("output", "build/app.exe")  # fallback if not defined
-    if os.path.exists(exe_path):
-        try:
-            os.remove(exe_path)
-            logger.info(f"Deleted previous executable: {exe_path}")
-        except Exception as e:
-            logger.critical(f"Could not delete old executable: {e}")
-            return
 
-    os.makedirs(".forgebuild/cache", exist_ok=True)
+    ensure_dir(CACHE_DIR)
+
+    def hash_headers(headers, cached_headers, cached_stamps):
+        stamps = {}
+        for h in headers:
+            stamp = file_stamp(h)
+            if stamp is not None:
+                stamps[h] = stamp
+        hashes = hash_pool.map(
+            lambda h: hash_if_changed(h, stamps[h], cached_headers.get(h), None if content_hash else cached_stamps.get(h)),
+            stamps
+        )
+        return stamps, dict(zip(stamps, hashes))
+
+    # check_source only reads its own cache entry and hands a job back to the scheduler below,
+    # so worker threads never touch shared state and need no locks
+    def check_source(src, cached_entry, src_stamp):
+        name = cache_name(src)
+        obj = name + ".forgebin"
+        depfile = name + ".d"
+        meta = name + ".meta.json"
+
+        cached_cpp_hash = cached_entry.get("cpp_hash")
+        cached_headers = cached_entry.get("headers", {})
+        cached_stamps = cached_entry.get("header_stamps", {})
+
+        cached_stamp = None if content_hash else [cached_entry.get("mtime_ns"), cached_entry.get("size")]
+        src_hash = hash_if_changed(src, src_stamp, cached_cpp_hash, cached_stamp)
+
+        if verbose:
+            logger.info(f"Current hash: {src_hash}")
+            logger.info(f"Cached cpp hash: {cached_cpp_hash}")
+
+        obj_missing = not os.path.exists(obj)
+        if obj_missing and use_cache and cached_cpp_hash == src_hash and restore_chunks(obj):
+            logger.info(f"Restored {obj} from the chunk store.")
+            obj_missing = False
+
+        should_compile = (
+            not use_cache or
+            cached_cpp_hash != src_hash or
+            obj_missing
+        )
 
-    object_files = []
+        if should_compile:
+            # getting rebuilt anyway, the headers are picked up from the fresh depfile afterwards
+            header_stamps, header_hashes = {}, {}
+            header_changed = False
+        else:
+            # the header list from the last compile is already in the sidecar, so the depfile is only ever read right after a compile
+            header_stamps, header_hashes = hash_headers(cached_headers, cached_headers, cached_stamps)
 
-    def compile_source(src):
-        global COMPILER_LOGS
-        comp_time = time.perf_counter()
-        nonlocal compiled_count
-        
-        obj = os.path.join(".forgebuild", "cache", os.path.basename(src).replace(".cpp", ".forgebin"))
-        depfile = os.path.join(".forgebuild", "cache", os.path.basename(src).replace(".cpp", ".d"))
-
-        with object_lock:
-            object_files.append(obj)
-
-        with cache_lock:
-            src_hash = hash_file(src)
-            cached_entry = cache.get(src, {})
-            cached_cpp_hash = cached_entry.get("cpp_hash")
-            cached_headers = cached_entry.get("headers", {})
-
-            if verbose:
-                logger.info(f"Current hash: {src_hash}")
-                logger.info(f"Cached cpp hash: {cached_cpp_hash}")
-
-            should_compile = (
-                not use_cache or
-                cached_cpp_hash != src_hash or
-                not os.path.exists(obj)
+            # Detect header changes
+            header_changed = any(
+                cached_headers.get(h) != header_hashes[h] for h in header_hashes
             )
 
-        # Always parse headers if depfile exists
-        headers = parse_dependencies(depfile) if os.path.exists(depfile) else []
-        header_hashes = {h: hash_file(h) for h in headers if os.path.exists(h)}
-
-        # Detect header changes
-        header_changed = any(
-            cached_headers.get(h) != header_hashes[h] for h in header_hashes
-        )
-
-        if should_compile or header_changed:
-            thr_id = threading.get_ident()
+        if verbose: # one line per file adds up fast on big trees, the scheduler logs totals otherwise
             if should_compile:
                 logger.info(f"Source file {src} has changed or is not cached.")
             elif header_changed:
                 logger.info(f"One or more headers for {src} have changed.")
-            logger.info(f"Compiling {src} -> {obj} on thread {thr_id}")
-
-            
-            cmd = [compiler] + flags + ["-c", src, "-o", obj, "-MMD", "-MF", depfile]
+            else:
+                logger.info(f"Skipping compile of {src} — no changes detected.")
+
+        return {
+            "src": src,
+            "obj": obj,
+            "depfile": depfile,
+            "meta": meta,
+            "cached_entry": cached_entry,
+            "src_hash": src_hash,
+            "src_stamp": src_stamp,
+            "header_stamps": header_stamps,
+            "header_hashes": header_hashes,
+            "dirty": should_compile or header_changed
+        }
+
+    def trusted(stamp):
+        # a file written right around the time we hashed it can be edited again without its mtime moving
+        # (coarse timestamps!), so that stamp can't vouch for the hash next build. same idea as git's "racily clean" entries
+        if stamp and stamp[0] < stamp_time - RACY_WINDOW_NS:
+            return stamp
+        return None
+
+    def finish_source(job):
+        # stamps are refreshed even when skipping, so a touched-but-unchanged file is only rehashed once
+        src_stamp = trusted(job["src_stamp"])
+        entry = {
+            "cpp_hash": job["src_hash"],
+            "mtime_ns": src_stamp[0] if src_stamp else None,
+            "size": src_stamp[1] if src_stamp else None,
+            "headers": job["header_hashes"],
+            "header_stamps": {h: trusted(stamp) for h, stamp in job["header_stamps"].items()}
+        }
+        if entry != job["cached_entry"]:
             try:
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                save_entry(job["meta"], job["src"], entry)
             except Exception as e:
-                logger.critical("Failed to start compilation process: " + str(e))
-                return False
-
-            if verbose:
-
-                COMPILER_LOGS = "STDOUT:" + result.stdout + "\n" + "STDERR:" + result.stderr
+                logger.error(f"failed to save cache entry for {job['src']}: {e}")
+        return entry
 
-            if result.returncode != 0:
-
-                COMPILER_LOGS = "STDOUT:" + result.stdout + "\n" + "STDERR:" + result.stderr
-                logger.critical(f"Compilation failed for {src}")
-                return False
+    entries = [cache.get(src, {}) for src in sources]
+    stamps = [walk_stamps.get(src) or file_stamp(src) for src in sources]
 
-            with cache_lock:
-                cache[src] = {
-                    "cpp_hash": src_hash,
-                    "headers": header_hashes
-                }
+    # stat calls plus hashing of whatever changed. mmap/file_digest/blake3 all drop the GIL while they hash,
+    # so threads are plenty (worker processes cost more to start than hashing a whole source tree)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        plans = list(executor.map(check_source, sources, entries, stamps))
+
+    def batch_outputs(job):
+        # with several inputs the compiler can't take -o/-MF, it writes <stem>.o and <stem>.d into the current folder
+        stem = os.path.splitext(os.path.basename(job["src"]))[0]
+        return stem + ".o", stem + ".d"
+
+    # one thread drives every compiler: start up to max_jobs of them and reap whichever finishes first.
+    # output goes to temp files instead of pipes, so a chatty compiler can never stall on a full pipe
+    max_jobs = jobs or os.cpu_count() or 1 # cpu_count() can be None when it can't be determined
+    logger.info(f"using: {max_jobs} parallel jobs!")
+
+    # starting clang++ can cost more than compiling a small TU, so when there is more work than jobs
+    # each compiler gets a few sources. verbose builds stay one per compiler so the logs make sense
+    dirty = [job for job in plans if job["dirty"]]
+    if not verbose and dirty:
+        logger.info(f"{len(dirty)} {'file has' if len(dirty) == 1 else 'files have'} changed or {'is' if len(dirty) == 1 else 'are'} not cached.")
+    if not verbose and len(dirty) < len(plans):
+        skipped = len(plans) - len(dirty)
+        logger.info(f"Skipping {skipped} unchanged {'file' if skipped == 1 else 'files'}.")
+    # ccache gives up on (and doesn't cache) a compile with several inputs, so with ccache every source gets its own call
+    batch_size = 1 if verbose or launcher else min(MAX_BATCH, max(1, len(dirty) // max_jobs))
+    pending = collections.deque()
+    # every batch writes into the same folder and batches run side by side, so a stem can only be claimed once per build.
+    # a second src/b/f1.cpp goes in a batch of its own, which uses -o/-MF and never touches ./f1.o
+    batch, stems = [], set()
+    for job in dirty:
+        obj_out, dep_out = batch_outputs(job)
+        if batch_size == 1 or obj_out in stems or os.path.exists(obj_out) or os.path.exists(dep_out):
+            pending.append([job]) # never clobber a file that is already sitting there
+            continue
+        batch.append(job)
+        stems.add(obj_out)
+        if len(batch) == batch_size:
+            pending.append(batch)
+            batch = []
+    if batch:
+        pending.append(batch)
+
+    compile_cmd = launcher + [compiler] + flags + ["-c", "-MMD"] # the same for every compile, only the files change
+    running = {}
+    failed_logs = [] # (sources, stdout, stderr) of every compile that failed, not just the last one to finish
+    chunking = {} # store_chunks future -> object
+    build_succeed = True # default to true, we'll set to false if any compilation fails
+    try:
+        # after a failure nothing new gets started, so only wait for what is still running
+        while running or (build_succeed and pending):
+            while build_succeed and pending and len(running) < max_jobs:
+                batch = pending.popleft()
+                if len(batch) == 1:
+                    job = batch[0]
+                    cmd = compile_cmd + [job["src"], "-o", job["obj"], "-MF", job["depfile"]]
+                else:
+                    cmd = compile_cmd + [job["src"] for job in batch]
+                # stdout only matters in verbose mode, stderr is kept for the failure report
+                out = tempfile.TemporaryFile() if verbose else None
+                err = tempfile.TemporaryFile()
+                try:
+                    proc = subprocess.Popen(cmd, stdout=out or subprocess.DEVNULL, stderr=err)
+                except Exception as e:
+                    if out:
+                        out.close()
+                    err.close()
+                    logger.critical("Failed to start compilation process: " + str(e))
+                    build_succeed = False
+                    break
+                for job in batch:
+                    logger.info(f"Compiling {job['src']} -> {job['obj']} as pid {proc.pid}")
+                running[proc] = (batch, out, err, time.perf_counter())
+
+            finished = [proc for proc in running if proc.poll() is not None]
+            if not finished:
+                if running:
+                    time.sleep(0.005)
+                continue
 
-            end = time.perf_counter()
-            logger.info(f"thread {thr_id} finished compiling {src} in {end - comp_time:.3f}s")
-            compiled_count += 1
-        else:
-            logger.info(f"Skipping compile of {src} — no changes detected.")
+            for proc in finished:
+                batch, out, err, comp_time = running.pop(proc)
+                if proc.returncode != 0:
+                    # only decode when someone is going to read it
+                    failed_logs.append(([job["src"] for job in batch], read_log_tail(out) if out else "", read_log_tail(err)))
+                if out:
+                    out.close()
+                err.close()
+
+                end = time.perf_counter()
+                for job in batch:
+                    if len(batch) == 1:
+                        ok = proc.returncode == 0
+                    else:
+                        # a TU in a batch worked if its object showed up, the exit code only says *something* failed
+                        obj_out, dep_out = batch_outputs(job)
+                        ok = os.path.exists(obj_out)
+                        if ok:
+                            os.replace(obj_out, job["obj"])
+                            if os.path.exists(dep_out):
+                                os.replace(dep_out, job["depfile"])
+                        elif os.path.exists(dep_out):
+                            os.remove(dep_out)
+
+                    if not ok:
+                        logger.critical(f"Compilation failed for {job['src']}")
+                        build_succeed = False # exit early on compilation failure, we only wait for what is already running
+                        continue
+
+                    # the compiler just rewrote the depfile, so record the headers this compile actually used
+                    job["header_stamps"], job["header_hashes"] = hash_headers(
+                        parse_dependencies(job["depfile"]),
+                        job["cached_entry"].get("headers", {}),
+                        job["cached_entry"].get("header_stamps", {})
+                    )
+                    job["dirty"] = False
+                    if fastcdc is None:
+                        store_chunks(job["obj"]) # only drops an index left from a build that had fastcdc
+                    else:
+                        # chunking reads and hashes the whole object, keep that off the thread that launches compilers
+                        chunking[hash_pool.submit(store_chunks, job["obj"])] = job["obj"]
+
+                    if verbose:
+                        logger.info(f"pid {proc.pid} finished compiling {job['src']} in {end - comp_time:.3f}s")
+                    compiled_count += 1
+    finally:
+        # ctrl-c or a crash mid-build: stop whatever is still compiling, then take back the files
+        # the batches were writing into the project folder. left there, they'd block batching those stems for good
+        for proc, (batch, out, err, comp_time) in running.items():
+            proc.kill()
+            proc.wait()
+            if out:
+                out.close()
+            err.close()
+        for obj_out in stems:
+            for path in (obj_out, os.path.splitext(obj_out)[0] + ".d"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    for future, obj in chunking.items():
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"failed to chunk {obj}: {e}")
+    if chunking:
+        prune_chunks()
 
-        return True
+    # plans is in source order no matter which compile finished first, so the link line is reproducible
+    object_files = []
+    for job in plans:
+        if job["dirty"]:
+            continue # failed, or never started because something else failed
+        object_files.append(job["obj"])
+        cache[job["src"]] = finish_source(job)
 
-    build_succeed = True # default to true, we'll set to false if any compilation fails    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
-        logger.info(f"using: {jobs or os.cpu_count()} threads!")
-        futures = {executor.submit(compile_source, src): src for src in sources}
-        for future in concurrent.futures.as_completed(futures):
-            if not future.result():
-                build_succeed = False
-                break # exit early on compilation failure
     if not build_succeed:
         logger.critical("Build failed due to compilation errors.")
-        logger.info("Compiler logs:\n" + COMPILER_LOGS or "[]empty]")
-        return # we do this to avoid linking if compilation failed, since that would waste time and likely fail anyway
-    logger.info(f"Linking: {' and '.join(object_files)} into {output}")
-    cmd = [compiler] + object_files + ["-o", output]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+        logs = "\n".join(f"{' '.join(srcs)}:\nSTDOUT:{stdout}\nSTDERR:{stderr}" for srcs, stdout, stderr in failed_logs)
+        logger.info("Compiler logs:\n" + (logs or "[empty]"))
+        return False # we do this to avoid linking if compilation failed, since that would waste time and likely fail anyway
+
+    # nothing compiled, same objects as last link and the exe is newer than all of them? then the linker would just redo the same work
+    link_inputs = [output] + sorted(object_files) # sorted, the check shouldn't care what order the glob returned
+    try:
+        up_to_date = (
+            compiled_count == 0 and
+            cache.get("link") == link_inputs and
+            os.stat(exe_path).st_mtime_ns >= max(os.stat(o).st_mtime_ns for o in object_files)
+        )
+    except (OSError, ValueError):
+        up_to_date = False # no exe yet, an object went missing or there are no objects at all
+
+    result = None
+    if up_to_date:
+        logger.info(f"{output} is up to date, skipping link.")
+    else:
+        if verbose:
+            logger.info(f"Linking: {' and '.join(object_files)} into {output}")
+        else:
+            logger.info(f"Linking {len(object_files)} objects into {output}")
+        # link next to the real exe and swap it in afterwards, a failed link leaves the old exe (and its timestamp) alone
+        root, ext = os.path.splitext(exe_path)
+        tmp_exe = root + ".tmp" + ext
+        cmd = [compiler] + object_files + ["-o", tmp_exe]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        try:
+            if result.returncode == 0:
+                os.replace(tmp_exe, exe_path)
+            elif os.path.exists(tmp_exe):
+                os.remove(tmp_exe) # whatever the linker left behind is not an exe anyone should run
+        except OSError as e:
+            logger.critical(f"Could not replace old executable (is it still running?): {e}")
+            return False
 
     prnt = (
         f"{compiled_count} files had to be compiled in this build."
@@ -490,12 +1108,13 @@ def build_project(verbose=False, use_cache=False, fast=False, jobs=None,comp=Non
     )
     logger.info(prnt)
 
-    if result.returncode == 0 and result:
+    linked = result is None or result.returncode == 0
+    if linked:
+        cache["link"] = link_inputs
         logger.success(f"Build succeeded: {output}")
         logger.info("saving to cache...")
         try:
-            with cache_lock:
-                save_cache(cache)
+            save_cache(cache)
         except Exception as e:
             logger.error(f"cache saving failed! {e}")
         logger.info("cache saved!")
@@ -506,6 +1125,7 @@ def build_project(verbose=False, use_cache=False, fast=False, jobs=None,comp=Non
     bend = time.perf_counter()
     final_ms = (bend - build_timer) * 1000
     logger.success(f"build took: {final_ms}ms")
+    return linked
 
 
 staffroll = [
@@ -537,11 +1157,14 @@ def main():
     parser.add_argument("--build", action="store_true", help="Build your project")
     parser.add_argument("--sync", action="store_true", help="Sync dependencies from GitHub")
     parser.add_argument("--force-sync", action="store_true", help="Force re-sync of all dependencies")
+    parser.add_argument("--full-history", action="store_true", help="Clone dependencies with their full git history (default is a shallow clone)")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose compiler output")
     parser.add_argument("--force-rebuild", action="store_true", help="Recompile everything, ignoring cache")
     parser.add_argument("--credits", action="store_true", help="View the credits")
+    parser.add_argument("--slow", action="store_true", help="Scroll the credits line by line (use with --credits)")
     parser.add_argument("--fast", action="store_true", help="Enable -Ofast optimization (NOT RECOMMENDED!)")
     parser.add_argument("--fr", action="store_true", help="Alias for --force-rebuild")
+    parser.add_argument("--content-hash", action="store_true", help="Hash every file instead of trusting unchanged timestamps (for CI checkouts)")
     parser.add_argument("--jobs", type=int, help="Number of parallel compile jobs (default: auto)")
     parser.add_argument("--run", action="store_true", help="Run the compiled executable after build")
     parser.add_argument("--sodium-bad", action="store_true", help=argparse.SUPPRESS)  # hidden easter egg. DO NOT DOCUMENT THIS FLAG. (yes. it is an easter egg. I want to VENGANCE.... EHEHEHE)
@@ -554,10 +1177,15 @@ def main():
         return
 
     # Show credits if requested
+    # the dramatic pauses are for people watching a terminal, piped output (CI, grep) gets everything at once
+    interactive = sys.stdout.isatty()
     if args.credits:
-        for line in staffroll:
-            print(line)
-            time.sleep(.08)  # small delay for scrolling effect
+        if args.slow and interactive:
+            for line in staffroll:
+                print(line)
+                time.sleep(.08)  # small delay for scrolling effect
+        else:
+            sys.stdout.write("\n".join(staffroll) + "\n")
         return
     if args.sodium_bad:
         msg = """
@@ -578,12 +1206,14 @@ def main():
             
         """
         print("Trying to build...")
-        time.sleep(2)
+        if interactive:
+            time.sleep(2)
         print("FAILED: SODIUM_NOTICED_ERROR")
 
         for line in msg.splitlines():
             logger.critical(GlitchText(line))
-            time.sleep(.5)
+            if interactive:
+                time.sleep(.5)
         print("was that... too much?")
         print("If you want to see why I added this? https://github.com/CaffeineMC/sodium/issues/3256 yes. that is why.")
         return
@@ -598,7 +1228,7 @@ def main():
 
     # Sync dependencies (optionally force re-sync)
     if args.sync:
-        sync_dependencies(force=args.force_sync)
+        sync_dependencies(force=args.force_sync, full_history=args.full_history)
 
     # Prevent mixing --build and --force-rebuild flags
     if (args.force_rebuild or args.fr) and args.build:
@@ -606,20 +1236,25 @@ def main():
         exit(1)
 
     # Handle normal build
+    built = True # stays true when nothing was built, --run on its own just runs whatever is there
     if args.build:
         fst = args.fast
         # If compiler override is requested, force rebuild must be enabled
         # (This is now removed since I have removed G++ support)
-        build_project(verbose=args.verbose, use_cache=True, fast=fst, jobs=args.jobs, argu=args)
+        built = build_project(verbose=args.verbose, use_cache=True, fast=fst, jobs=args.jobs, argu=args, content_hash=args.content_hash)
 
     # Handle force rebuild (ignores cache)
     if args.force_rebuild or args.fr:
         fst = args.fast
-        build_project(verbose=args.verbose, use_cache=False, fast=fst, jobs=args.jobs, argu=args)
+        built = build_project(verbose=args.verbose, use_cache=False, fast=fst, jobs=args.jobs, argu=args)
 
     # Run the compiled executable
     if args.run:
-        run_project(verbose=args.verbose)
+        if not built:
+            # the old exe is kept around on failure now, running it would look like the build worked
+            logger.critical("not running the executable because the build failed!")
+        else:
+            run_project(verbose=args.verbose)
 
 
 # Entry point: only run main() if script is executed directly